@@ -1,3 +1,4 @@
+import concurrent.futures
 import os
 import tempfile
 import sys
@@ -17,6 +18,7 @@ class Assembler:
       only_assembler=True,
       verbose=False,
       spades_use_first_success=False,
+      spades_max_jobs=1,
       assembler='spades',
       genomeSize=100000, # only matters for Canu if correcting reads (which we're not)
       data_type='pacbio-corrected',
@@ -35,6 +37,7 @@ class Assembler:
             self.spades = external_progs.make_and_check_prog('spades', verbose=self.verbose, required=True)
             self.spades_kmers = self._build_spades_kmers(spades_kmers)
             self.spades_use_first_success = spades_use_first_success
+            self.spades_max_jobs = spades_max_jobs
             self.careful = careful
             self.only_assembler = only_assembler
         elif self.assembler == 'canu':
@@ -61,12 +64,15 @@ class Assembler:
             raise Error('Error getting list of kmers from:' + str(kmers))
 
 
-    def _make_spades_command(self, kmer, outdir):
+    def _make_spades_command(self, kmer, outdir, threads=None):
+        if threads is None:
+            threads = self.threads
+
         cmd = [
             self.spades.exe(),
             '-s', self.reads,
             '-o', outdir,
-            '-t', str(self.threads),
+            '-t', str(threads),
             '-k', str(kmer),
         ]
 
@@ -94,31 +100,53 @@ class Assembler:
         return ' '.join(cmd)
 
 
-    def run_spades_once(self, kmer, outdir):
-        cmd = self._make_spades_command(kmer, outdir)
+    def run_spades_once(self, kmer, outdir, threads=None):
+        cmd = self._make_spades_command(kmer, outdir, threads=threads)
         return common.syscall(cmd, verbose=self.verbose, allow_fail=True)
 
 
+    def _run_spades_get_n50(self, kmer, outdir, threads):
+        '''Runs spades with one kmer. Returns N50 of the assembly, or zero if it failed'''
+        ok, errs = self.run_spades_once(kmer, outdir, threads=threads)
+        if not ok:
+            return 0
+
+        contigs_fasta = os.path.join(outdir, 'contigs.fasta')
+        contigs_fai = contigs_fasta + '.fai'
+        common.syscall(self.samtools.exe() + ' faidx ' + contigs_fasta, verbose=self.verbose)
+        stats = pyfastaq.tasks.stats_from_fai(contigs_fai)
+        return stats['N50']
+
+
     def run_spades(self, stop_at_first_success=False):
         '''Runs spades on all kmers. Each a separate run because SPAdes dies if any kmer does
-           not work. Chooses the 'best' assembly to be the one with the biggest N50'''
+           not work. Chooses the 'best' assembly to be the one with the biggest N50.
+           When stopping at the first success, the kmers are run one at a time with all the
+           threads, so that later kmers are only run if the earlier ones failed. Otherwise up
+           to spades_max_jobs kmers are run at once, sharing the threads between them'''
         n50 = {}
         kmer_to_dir = {}
 
-        for k in self.spades_kmers:
-            tmpdir = tempfile.mkdtemp(prefix=self.outdir + '.tmp.spades.' + str(k) + '.', dir=os.getcwd())
-            kmer_to_dir[k] = tmpdir
-            ok, errs = self.run_spades_once(k, tmpdir)
-            if ok:
-                contigs_fasta = os.path.join(tmpdir, 'contigs.fasta')
-                contigs_fai = contigs_fasta + '.fai'
-                common.syscall(self.samtools.exe() + ' faidx ' + contigs_fasta, verbose=self.verbose)
-                stats = pyfastaq.tasks.stats_from_fai(contigs_fai)
-                if stats['N50'] != 0:
-                    n50[k] = stats['N50']
-
-                    if stop_at_first_success:
-                        break
+        def make_kmer_dir(k):
+            kmer_to_dir[k] = tempfile.mkdtemp(prefix=self.outdir + '.tmp.spades.' + str(k) + '.', dir=os.path.dirname(self.outdir))
+            return kmer_to_dir[k]
+
+        if stop_at_first_success:
+            for k in self.spades_kmers:
+                kmer_n50 = self._run_spades_get_n50(k, make_kmer_dir(k), self.threads)
+                if kmer_n50 != 0:
+                    n50[k] = kmer_n50
+                    break
+        else:
+            parallel_jobs = max(1, min(len(self.spades_kmers), self.threads, self.spades_max_jobs))
+            threads_per_job = max(1, self.threads // parallel_jobs)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=parallel_jobs) as executor:
+                futures = [(k, executor.submit(self._run_spades_get_n50, k, make_kmer_dir(k), threads_per_job)) for k in self.spades_kmers]
+
+            for k, future in futures:
+                kmer_n50 = future.result()
+                if kmer_n50 != 0:
+                    n50[k] = kmer_n50
 
         if len(n50) > 0:
             if self.verbose:
@@ -3,6 +3,7 @@ import shutil
 import tempfile
 import pymummer
 import pyfastaq
+from circlator import common
 
 class Error (Exception): pass
 
@@ -64,6 +65,8 @@ class Cleaner:
 
     def _run_nucmer(self, infile, outfile):
         '''Run nucmer of assembly against itself'''
+        infile = os.path.abspath(infile)
+        outfile = os.path.abspath(outfile)
         n = pymummer.nucmer.Runner(
             infile,
             infile,
@@ -76,7 +79,8 @@ class Cleaner:
             simplify=False,
             verbose=self.verbose
         )
-        n.run()
+        with common.working_directory(os.path.dirname(outfile)):
+            n.run()
 
 
     def _load_nucmer_hits(self, infile):
@@ -1,3 +1,4 @@
+import contextlib
 import sys
 import os
 import subprocess
@@ -34,6 +35,19 @@ def syscall_get_stdout(cmd):
         raise Error('Error in system call. I tried to run:\n' + str(cmd))
 
 
+@contextlib.contextmanager
+def working_directory(path):
+    '''Changes to directory path for the body of a with statement, then changes
+       back. Used around pymummer runs, because pymummer before version 0.12
+       makes its scratch directory in the current directory'''
+    original_dir = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(original_dir)
+
+
 def decode(x):
     try:
         s = x.decode()
@@ -49,3 +63,38 @@ def check_files_exist(filenames):
         for filename in files_not_found:
             print('File not found: "', filename, '"', sep='', file=sys.stderr)
         raise Error('File(s) not found. Cannot continue')
+
+
+def count_clean_fasta(filename):
+    '''Returns the number of sequences in filename if it is an uncompressed FASTA
+       file with unique names that have no whitespace, and that samtools faidx
+       can index: no blank lines, and all lines of each sequence the same
+       length apart from the last one, which can be shorter. Otherwise returns None'''
+    names = set()
+    with open(filename, 'rb', buffering=1 << 20) as f:
+        if f.read(1) != b'>':
+            return None
+        f.seek(0)
+
+        for line in f:
+            if b'\r' in line:
+                return None
+            elif line.startswith(b'>'):
+                name = line[1:].rstrip(b'\n')
+                if len(name) == 0 or len(name.split()) != 1 or name.split()[0] != name or name in names:
+                    return None
+                names.add(name)
+                line_length = None
+                found_short_line = False
+            else:
+                length = len(line.rstrip(b'\n'))
+                if length == 0:
+                    return None
+                elif line_length is None:
+                    line_length = length
+                elif found_short_line or length > line_length:
+                    return None
+                elif length < line_length:
+                    found_short_line = True
+
+    return len(names)
@@ -24,6 +24,7 @@ class Merger:
           min_spades_circular_percent=95,
           spades_kmers=None,
           spades_use_first_success=False,
+          spades_max_jobs=1,
           spades_careful=True,
           spades_only_assembler=True,
           assembler='spades',
@@ -52,6 +53,7 @@ class Merger:
         self.min_spades_circular_percent = min_spades_circular_percent
         self.spades_kmers = spades_kmers
         self.spades_use_first_success = spades_use_first_success
+        self.spades_max_jobs = spades_max_jobs
         self.spades_careful = spades_careful
         self.spades_only_assembler = spades_only_assembler
         self.length_cutoff=length_cutoff
@@ -66,13 +68,15 @@ class Merger:
         self.original_contigs = {}
         self.reassembly_contigs = self.reassembly.get_contigs()
         pyfastaq.tasks.file_to_dict(self.original_fasta, self.original_contigs)
+        self.n_input_contigs = len(self.original_contigs)
 
 
     def _run_nucmer(self, ref, qry, outfile):
         '''Run nucmer of new assembly vs original assembly'''
+        outfile = os.path.abspath(outfile)
         n = pymummer.nucmer.Runner(
-            ref,
-            qry,
+            os.path.abspath(ref),
+            os.path.abspath(qry),
             outfile,
             min_id=self.nucmer_min_id,
             min_length=self.nucmer_min_length,
@@ -82,7 +86,8 @@ class Merger:
             simplify=True,
             verbose=self.verbose
         )
-        n.run()
+        with circlator.common.working_directory(os.path.dirname(outfile)):
+            n.run()
 
 
     def _load_nucmer_hits(self, infile):
@@ -637,10 +642,6 @@ class Merger:
         '''Writes crunch file and shell script to start up ACT, showing comparison of ref and qry'''
         if self.verbose:
             print('Making ACT files from', ref_fasta, qry_fasta, coords_file)
-        ref_fasta = os.path.relpath(ref_fasta)
-        qry_fasta = os.path.relpath(qry_fasta)
-        coords_file = os.path.relpath(coords_file)
-        outprefix = os.path.relpath(outprefix)
         self._index_fasta(ref_fasta)
         self._index_fasta(qry_fasta)
         crunch_file = outprefix + '.crunch'
@@ -651,10 +652,13 @@ class Merger:
             qry_fai=qry_fasta + '.fai'
         )
 
+        # paths in the script are relative to the directory it is in, so that
+        # it can be run from there
         bash_script = outprefix + '.start_act.sh'
+        script_dir = os.path.dirname(os.path.abspath(bash_script))
         with open(bash_script, 'w') as f:
             print('#!/usr/bin/env bash', file=f)
-            print('act', ref_fasta, crunch_file, qry_fasta, file=f)
+            print('act', *[os.path.relpath(x, script_dir) for x in [ref_fasta, crunch_file, qry_fasta]], file=f)
 
         pyfastaq.utils.syscall('chmod +x ' + bash_script)
 
@@ -680,7 +684,7 @@ class Merger:
             print(this_log_prefix, '\tUsing nucmer matches from ', nucmer_coords, sep='', file=log_fh)
             self._run_nucmer(genome_fasta, self.reassembly.contigs_fasta, nucmer_coords)
             act_prefix = outprefix + '.iter.' + str(iteration)
-            print(this_log_prefix, '\tYou can view the nucmer matches with ACT using: ./', act_prefix, '.start_act.sh', sep='', file=log_fh)
+            print(this_log_prefix, '\tYou can view the nucmer matches with ACT using: ./', os.path.basename(act_prefix), '.start_act.sh', sep='', file=log_fh)
             self._write_act_files(genome_fasta, self.reassembly.contigs_fasta, nucmer_coords, act_prefix)
             nucmer_hits_by_ref = self._load_nucmer_hits(nucmer_coords)
             made_a_join = self._merge_all_bridged_contigs(nucmer_hits_by_ref, self.original_contigs, self.reassembly_contigs, log_fh, this_log_prefix)
@@ -715,6 +719,7 @@ class Merger:
                     verbose=self.verbose,
                     spades_kmers=self.spades_kmers,
                     spades_use_first_success=self.spades_use_first_success,
+                    spades_max_jobs=self.spades_max_jobs,
                     assembler=self.assembler,
                     genomeSize=self.length_cutoff,
                     data_type=self.data_type
@@ -726,7 +731,11 @@ class Merger:
                 print(this_log_prefix, '\tNo contig merges were made',sep='', file=log_fh)
 
         pyfastaq.utils.close(log_fh)
-        # rewrite file with short name
+        # rewrite file with short name. If no merges were made, genome_fasta is
+        # still the input file (which may be a link to the user's own file), so
+        # write a new file instead of overwriting it
+        if genome_fasta == self.original_fasta:
+            genome_fasta = outprefix + '.fasta'
         with pyfastaq.utils.open_file_write(genome_fasta) as fhout:
             for i, contig in enumerate(sorted(self.original_contigs.values(), key=lambda v: len(v), reverse=True)):
                 contig.id = f"ctg{i + 1} {contig.id}"
@@ -823,8 +832,9 @@ class Merger:
             self._run_nucmer(self.original_fasta, self.reassembly.contigs_fasta, nucmer_circularise_coords)
             self._write_act_files(self.original_fasta, self.reassembly.contigs_fasta, nucmer_circularise_coords, self.outprefix + '.circularise')
         else:
-            os.symlink(nucmer_coords_file, nucmer_circularise_coords)
-            os.symlink(act_script, self.outprefix + '.circularise.start_act.sh')
+            act_script_link = self.outprefix + '.circularise.start_act.sh'
+            os.symlink(os.path.relpath(nucmer_coords_file, os.path.dirname(nucmer_circularise_coords)), nucmer_circularise_coords)
+            os.symlink(os.path.relpath(act_script, os.path.dirname(os.path.abspath(act_script_link))), act_script_link)
 
         nucmer_hits = self._load_nucmer_hits(nucmer_circularise_coords)
         self._circularise_contigs(nucmer_hits)
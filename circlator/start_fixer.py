@@ -37,6 +37,7 @@ class StartFixer:
         self.promer_mincluster = promer_mincluster
         self.outprefix = os.path.abspath(outprefix)
         self.verbose = verbose
+        self.n_output_contigs = None
 
         if ignore is None:
             self.ignore = set()
@@ -121,16 +122,17 @@ class StartFixer:
             return {}
 
         prunner = pymummer.nucmer.Runner(
-            contigs_with_ends,
-            ref_genes_fa,
-            promer_out,
+            os.path.abspath(contigs_with_ends),
+            os.path.abspath(ref_genes_fa),
+            os.path.abspath(promer_out),
             min_id=min_percent_id,
             promer=True,
             verbose=False,
             maxmatch=True,
             mincluster=promer_mincluster,
         )
-        prunner.run()
+        with circlator.common.working_directory(os.path.dirname(os.path.abspath(promer_out))):
+            prunner.run()
 
         circularized = {} # original_contig_name -> promer match
         file_reader = pymummer.coords_file.reader(promer_out)
@@ -339,3 +341,4 @@ class StartFixer:
             contig_rename_dict,
             self.outprefix + '.fasta'
         )
+        self.n_output_contigs = len(renamed_contigs)
@@ -1,7 +1,9 @@
 import argparse
+import io
 import os
 import shutil
 import sys
+import threading
 
 import circlator
 import pyfastaq
@@ -10,11 +12,107 @@ import pyfastaq
 class Error (Exception): pass
 
 
+IO_BUFFER_SIZE = 1 << 20
+MERGE_LOG_PREFIX = '[merge circularised]\t'
+MERGE_LOG_HEADER = '\t'.join(['[merge circularised]', '#Contig', 'repetitive_deleted', 'circl_using_nucmer', 'circl_using_spades', 'circularised'])
+STAGES = ['mapreads', 'bam2reads', 'assemble', 'merge', 'clean', 'fixstart']
+
+
+BANNERS = {x: '{:_^79}'.format(' ' + x + ' ') for x in [
+    'Checking external programs',
+    'Running mapreads',
+    'Running bam2reads',
+    'Running assemble',
+    '--b2r_only_contigs used - filering contigs',
+    'Running merge',
+    'Running clean',
+    'Running fixstart',
+    'Summary',
+]}
+
+
 def print_message(m, opts):
     if opts.verbose:
         print(m)
 
 
+def print_banner(name, opts):
+    if opts.verbose:
+        print(BANNERS[name])
+
+
+def prefetch_file(filename):
+    '''Asks the kernel to start reading filename into the page cache, so that
+       it is (at least partly) there by the time an external program needs it.
+       The kernel decides how much to read ahead given the free memory, so
+       large files cannot push their own start back out of the cache'''
+    if not hasattr(os, 'posix_fadvise'):
+        return
+
+    try:
+        fd = os.open(filename, os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def prefetch_in_background(filename):
+    threading.Thread(target=prefetch_file, args=(filename,), daemon=True).start()
+
+
+def filter_fasta(infile, outfile, ids_file, verbose=False):
+    '''Writes the sequences in infile named in ids_file to outfile. Uses
+       samtools faidx when it is new enough, otherwise pyfastaq. Either way,
+       each sequence is written once, in the same order as in infile'''
+    samtools = circlator.external_progs.make_and_check_prog('samtools', verbose=verbose)
+    if samtools.version_at_least('1.7'):
+        if not os.path.exists(infile + '.fai'):
+            circlator.common.syscall(samtools.exe() + ' faidx ' + infile, verbose=verbose)
+
+        # samtools writes the regions in the order given, including any
+        # repeats, so give it the names in the order of the input file
+        with open(ids_file) as f:
+            ids = {line.rstrip() for line in f}
+
+        regions_file = outfile + '.regions.tmp'
+        with open(infile + '.fai') as f_fai, open(regions_file, 'w') as f_regions:
+            for line in f_fai:
+                name = line.split('\t')[0]
+                if name in ids:
+                    print(name, file=f_regions)
+
+        cmd = ' '.join([samtools.exe(), 'faidx', infile, '-r', regions_file, '-o', outfile])
+        ok, errs = circlator.common.syscall(cmd, allow_fail=True, verbose=verbose)
+        os.unlink(regions_file)
+        if ok:
+            return
+
+    pyfastaq.tasks.filter(infile, outfile, ids_file=ids_file)
+
+
+def remove_stage_files(outdir, stages, keep=None):
+    '''Removes output files and directories of the given stages, found by their
+       number prefix (eg "03." for assemble), except for names in keep'''
+    if keep is None:
+        keep = set()
+
+    prefixes = tuple('{:02}.'.format(STAGES.index(x) + 1) for x in stages)
+    for name in os.listdir(outdir):
+        path = os.path.join(outdir, name)
+        if not name.startswith(prefixes) or path in keep:
+            continue
+        elif os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            os.unlink(path)
+
+
 def run():
     parser = argparse.ArgumentParser(
         description = 'Run mapreads, bam2reads, assemble, merge, clean, fixstart',
@@ -25,6 +123,8 @@ def run():
     parser.add_argument('--unchanged_code', type=int, help='Code to return when the input assembly is not changed [%(default)s]', default=0, metavar='INT')
     parser.add_argument('--assembler', choices=circlator.common.allowed_assemblers, help='Assembler to use for reassemblies [%(default)s]', default='spades')
     parser.add_argument('--split_all_reads', action='store_true', help='By default, reads mapped to shorter contigs are left unchanged. This option splits them into two, broken at the middle of the contig to try to force circularization. May help if the assembler does not detect circular contigs (eg canu)')
+    parser.add_argument('--start_stage', choices=STAGES, help='Stage to start from. If not the first stage, the output directory must contain the output of the previous stages, from an earlier run [%(default)s]', default=STAGES[0])
+    parser.add_argument('--end_stage', choices=STAGES, help='Stage to stop after [%(default)s]', default=STAGES[-1])
     parser.add_argument('--data_type', choices=circlator.common.allowed_data_types, help='String representing one of the 4 type of data analysed (only used for Canu) [%(default)s]', default='pacbio-corrected')
     parser.add_argument('assembly', help='Name of original assembly', metavar='assembly.fasta')
     parser.add_argument('reads', help='Name of corrected reads FASTA or FASTQ file', metavar='reads.fasta/q')
@@ -41,6 +141,7 @@ def run():
 
     assemble_group = parser.add_argument_group('assemble options')
     parser.add_argument('--assemble_spades_k', help='Comma separated list of kmers to use when running SPAdes. Max kmer is 127 and each kmer should be an odd integer [%(default)s]', default='127,117,107,97,87,77', metavar='k1,k2,k3,...')
+    parser.add_argument('--assemble_spades_jobs', type=int, help='Max number of SPAdes kmers to run at once, sharing --threads between them. Each run needs its own RAM, so only increase this if there is enough memory. Not used with --assemble_spades_use_first [%(default)s]', default=1, metavar='INT')
     parser.add_argument('--assemble_spades_use_first', action='store_true', help='Use the first successful SPAdes assembly. Default is to try all kmers and use the assembly with the largest N50')
     parser.add_argument('--assemble_not_careful', action='store_true', help='Do not use the --careful option with SPAdes (used by default)')
     parser.add_argument('--assemble_not_only_assembler', action='store_true', help='Do not use the --assemble-only option with SPAdes (used by default). Important: with this option, the input reads must be in FASTQ format, otherwise SPAdes will crash because it needs quality scores to correct the reads.')
@@ -71,11 +172,17 @@ def run():
 
     options = parser.parse_args()
 
-    print_message('{:_^79}'.format(' Checking external programs '), options)
-    if options.verbose:
-        circlator.versions.get_all_versions(sys.stdout, raise_error=True, assembler=options.assembler)
-    else:
-        circlator.versions.get_all_versions(None, raise_error=True, assembler=options.assembler)
+    if STAGES.index(options.start_stage) > STAGES.index(options.end_stage):
+        parser.error('--start_stage ' + options.start_stage + ' is after --end_stage ' + options.end_stage)
+    stages_to_run = STAGES[STAGES.index(options.start_stage):STAGES.index(options.end_stage) + 1]
+    resuming = options.start_stage != STAGES[0]
+
+    # the SPAdes kmers are only used when SPAdes is the assembler
+    if options.assembler != 'spades':
+        options.assemble_spades_k = None
+
+    print_banner('Checking external programs', options)
+    versions_report = circlator.versions.get_all_versions(sys.stdout if options.verbose else None, raise_error=True, assembler=options.assembler)
 
 
     files_to_check = [options.assembly, options.reads]
@@ -93,180 +200,249 @@ def run():
 
     original_assembly = os.path.abspath(options.assembly)
     original_reads = os.path.abspath(options.reads)
+    if 'mapreads' in stages_to_run:
+        prefetch_in_background(original_reads)
 
-    try:
-        os.mkdir(options.outdir)
-    except FileExistsError as err:
-        if options.force:
-            shutil.rmtree(options.outdir)
+    if resuming:
+        if not os.path.isdir(options.outdir):
+            print('Output directory', options.outdir, 'not found. It is needed by --start_stage', options.start_stage, file=sys.stderr)
+            sys.exit(1)
+    else:
+        try:
             os.mkdir(options.outdir)
-        else:
-            raise err
-    except Exception:
-        print('Error making output directory', options.outdir, file=sys.stderr)
-        sys.exit(1)
-
-    os.chdir(options.outdir)
-
-    with open('00.info.txt', 'w') as f:
-        print(sys.argv[0], 'all', ' '.join(sys.argv[1:]), file=f)
-        circlator.versions.get_all_versions(f)
-
-    original_assembly_renamed = '00.input_assembly.fasta'
-    bam = '01.mapreads.bam'
-    filtered_reads_prefix = '02.bam2reads'
+        except FileExistsError as err:
+            if options.force:
+                # move the old directory out of the way and delete it while
+                # the pipeline runs. Not a daemon thread, so that python
+                # waits for the delete to finish before exiting
+                stale_dir = os.path.normpath(options.outdir) + '.stale.' + str(os.getpid())
+                os.rename(options.outdir, stale_dir)
+                os.mkdir(options.outdir)
+                threading.Thread(target=shutil.rmtree, args=(stale_dir,), kwargs={'ignore_errors': True}).start()
+            else:
+                raise err
+        except Exception:
+            print('Error making output directory', options.outdir, file=sys.stderr)
+            sys.exit(1)
+
+    # all output files are given as absolute paths, instead of changing
+    # the working directory of the whole process
+    outdir = os.path.abspath(options.outdir)
+
+    # when resuming, add to the info from the original run instead of replacing it
+    with open(os.path.join(outdir, '00.info.txt'), 'a' if resuming else 'w', buffering=1 << 16) as f:
+        f.write(sys.argv[0] + ' all ' + ' '.join(sys.argv[1:]) + '\n')
+        f.write(versions_report)
+
+    original_assembly_renamed = os.path.join(outdir, '00.input_assembly.fasta')
+    bam = os.path.join(outdir, '01.mapreads.bam')
+    filtered_reads_prefix = os.path.join(outdir, '02.bam2reads')
     filtered_reads =  filtered_reads_prefix + ('.fastq' if options.assemble_not_only_assembler else '.fasta')
-    assembly_dir = '03.assemble'
+    assembly_dir = os.path.join(outdir, '03.assemble')
     reassembly = os.path.join(assembly_dir, 'contigs.fasta')
-    merge_prefix = '04.merge'
+    merge_prefix = os.path.join(outdir, '04.merge')
     merged_fasta = merge_prefix + '.fasta'
-    clean_prefix = '05.clean'
+    clean_prefix = os.path.join(outdir, '05.clean')
     clean_fasta = clean_prefix + '.fasta'
-    fixstart_prefix = '06.fixstart'
+    fixstart_prefix = os.path.join(outdir, '06.fixstart')
     fixstart_fasta = fixstart_prefix + '.fasta'
+    merge_log = merge_prefix + '.circularise.log'
+    clean_keep_file = clean_prefix + '.contigs_to_keep'
+    not_fix_start_file = fixstart_prefix + '.contigs_to_not_change'
 
-    pyfastaq.tasks.to_fasta(
-        original_assembly,
-        original_assembly_renamed,
-        strip_after_first_whitespace=True,
-        check_unique=True
-    )
+    if options.b2r_only_contigs:
+        assembly_to_use = merge_prefix + '.00.filtered_assembly.fa'
+    else:
+        assembly_to_use = original_assembly_renamed
+
+    # the merge stage is the last one to read the input assembly. Make it
+    # afresh whenever that stage is run, in case a previous run changed it
+    remake_input_assembly = STAGES.index(options.start_stage) <= STAGES.index('merge')
+    number_of_input_contigs = None
+
+    if resuming:
+        stage_outputs = {
+            'mapreads': [bam],
+            'bam2reads': [filtered_reads],
+            'assemble': [reassembly],
+            'merge': [merged_fasta, merge_log],
+            'clean': [clean_fasta, clean_keep_file, not_fix_start_file],
+        }
+        files_to_check = [] if remake_input_assembly else [original_assembly_renamed]
+        for stage in STAGES[:STAGES.index(options.start_stage)]:
+            files_to_check.extend(stage_outputs[stage])
+        circlator.common.check_files_exist(files_to_check)
+        # stale output from the stages about to be rerun would get in the way.
+        # The list of contigs for fixstart to skip is made by the clean stage
+        remove_stage_files(outdir, STAGES[STAGES.index(options.start_stage):], keep={not_fix_start_file} if options.start_stage == 'fixstart' else None)
+
+    if remake_input_assembly:
+        for filename in original_assembly_renamed, original_assembly_renamed + '.fai':
+            if os.path.lexists(filename):
+                os.unlink(filename)
+
+        # no need to copy the assembly if it already has unique names with no
+        # whitespace: link to it instead
+        number_of_input_contigs = circlator.common.count_clean_fasta(original_assembly)
+        if number_of_input_contigs is None:
+            pyfastaq.tasks.to_fasta(
+                original_assembly,
+                original_assembly_renamed,
+                strip_after_first_whitespace=True,
+                check_unique=True
+            )
+        else:
+            os.symlink(original_assembly, original_assembly_renamed)
+
+        # index once here. samtools view -T when mapping, the contig filtering
+        # and the merge ACT files all use this .fai instead of making their own
+        samtools = circlator.external_progs.make_and_check_prog('samtools', verbose=options.verbose)
+        circlator.common.syscall(samtools.exe() + ' faidx ' + original_assembly_renamed, verbose=options.verbose)
 
     #-------------------------------- mapreads -------------------------------
-    print_message('{:_^79}'.format(' Running mapreads '), options)
-    circlator.mapping.bwa_mem(
-      original_assembly_renamed,
-      original_reads,
-      bam,
-      threads=options.threads,
-      bwa_options=options.bwa_opts,
-      verbose=options.verbose,
-    )
+    if 'mapreads' in stages_to_run:
+        print_banner('Running mapreads', options)
+        circlator.mapping.bwa_mem(
+          original_assembly_renamed,
+          original_reads,
+          bam,
+          threads=options.threads,
+          bwa_options=options.bwa_opts,
+          verbose=options.verbose,
+        )
 
 
     #-------------------------------- bam2reads ------------------------------
-    print_message('{:_^79}'.format(' Running bam2reads '), options)
-    bam_filter = circlator.bamfilter.BamFilter(
-        bam,
-        filtered_reads_prefix,
-        fastq_out=options.assemble_not_only_assembler,
-        length_cutoff=options.b2r_length_cutoff,
-        min_read_length=options.b2r_min_read_length,
-        contigs_to_use=options.b2r_only_contigs,
-        discard_unmapped=options.b2r_discard_unmapped,
-        verbose=options.verbose,
-        split_all_reads=options.split_all_reads,
-    )
-    bam_filter.run()
+    if 'bam2reads' in stages_to_run:
+        print_banner('Running bam2reads', options)
+        bam_filter = circlator.bamfilter.BamFilter(
+            bam,
+            filtered_reads_prefix,
+            fastq_out=options.assemble_not_only_assembler,
+            length_cutoff=options.b2r_length_cutoff,
+            min_read_length=options.b2r_min_read_length,
+            contigs_to_use=options.b2r_only_contigs,
+            discard_unmapped=options.b2r_discard_unmapped,
+            verbose=options.verbose,
+            split_all_reads=options.split_all_reads,
+        )
+        bam_filter.run()
 
 
     #-------------------------------- assemble -------------------------------
-    print_message('{:_^79}'.format(' Running assemble '), options)
-    a = circlator.assemble.Assembler(
-        filtered_reads,
-        assembly_dir,
-        threads=options.threads,
-        careful=not options.assemble_not_careful,
-        only_assembler=not options.assemble_not_only_assembler,
-        spades_kmers=options.assemble_spades_k,
-        spades_use_first_success=options.assemble_spades_use_first,
-        assembler=options.assembler,
-        genomeSize=options.b2r_length_cutoff,
-        data_type=options.data_type,
-        verbose=options.verbose
-    )
-    a.run()
+    if 'assemble' in stages_to_run:
+        print_banner('Running assemble', options)
+        a = circlator.assemble.Assembler(
+            filtered_reads,
+            assembly_dir,
+            threads=options.threads,
+            careful=not options.assemble_not_careful,
+            only_assembler=not options.assemble_not_only_assembler,
+            spades_kmers=options.assemble_spades_k,
+            spades_use_first_success=options.assemble_spades_use_first,
+            spades_max_jobs=options.assemble_spades_jobs,
+            assembler=options.assembler,
+            genomeSize=options.b2r_length_cutoff,
+            data_type=options.data_type,
+            verbose=options.verbose
+        )
+        a.run()
 
 
     #------------------------------ filter original assembly -----------------
-    if options.b2r_only_contigs:
-        print_message('{:_^79}'.format(' --b2r_only_contigs used - filering contigs '), options)
-        assembly_to_use = merge_prefix + '.00.filtered_assembly.fa'
-        pyfastaq.tasks.filter(original_assembly_renamed, assembly_to_use, ids_file=options.b2r_only_contigs)
-    else:
-        assembly_to_use = original_assembly_renamed
+    if 'merge' in stages_to_run and options.b2r_only_contigs:
+        print_banner('--b2r_only_contigs used - filering contigs', options)
+        filter_fasta(original_assembly_renamed, assembly_to_use, options.b2r_only_contigs, verbose=options.verbose)
 
 
     #-------------------------------- merge ----------------------------------
-    print_message('{:_^79}'.format(' Running merge '), options)
-    if not options.no_pair_merge:
-        merge_reads = filtered_reads
-    else:
-        merge_reads = None
-
-    m = circlator.merge.Merger(
-        assembly_to_use,
-        assembly_dir,
-        merge_prefix,
-        nucmer_diagdiff=options.merge_diagdiff,
-        nucmer_min_id=options.merge_min_id,
-        nucmer_min_length=options.merge_min_length,
-        nucmer_min_length_for_merges=options.merge_min_length_merge,
-        min_spades_circular_percent=options.merge_min_spades_circ_pc,
-        spades_kmers=options.assemble_spades_k,
-        spades_use_first_success=options.assemble_spades_use_first,
-        spades_careful=not options.assemble_not_careful,
-        spades_only_assembler=not options.assemble_not_only_assembler,
-        assembler=options.assembler,
-        length_cutoff=options.b2r_length_cutoff,
-        split_all_reads=options.split_all_reads,
-        data_type=options.data_type,
-        nucmer_breaklen=options.merge_breaklen,
-        ref_end_tolerance=options.merge_ref_end,
-        qry_end_tolerance=options.merge_reassemble_end,
-        threads=options.threads,
-        verbose=options.verbose,
-        reads=merge_reads
-    )
-    m.run()
+    m = None
+    if 'merge' in stages_to_run:
+        print_banner('Running merge', options)
+        if not options.no_pair_merge:
+            merge_reads = filtered_reads
+        else:
+            merge_reads = None
+
+        m = circlator.merge.Merger(
+            assembly_to_use,
+            assembly_dir,
+            merge_prefix,
+            nucmer_diagdiff=options.merge_diagdiff,
+            nucmer_min_id=options.merge_min_id,
+            nucmer_min_length=options.merge_min_length,
+            nucmer_min_length_for_merges=options.merge_min_length_merge,
+            min_spades_circular_percent=options.merge_min_spades_circ_pc,
+            spades_kmers=options.assemble_spades_k,
+            spades_use_first_success=options.assemble_spades_use_first,
+            spades_max_jobs=options.assemble_spades_jobs,
+            spades_careful=not options.assemble_not_careful,
+            spades_only_assembler=not options.assemble_not_only_assembler,
+            assembler=options.assembler,
+            length_cutoff=options.b2r_length_cutoff,
+            split_all_reads=options.split_all_reads,
+            data_type=options.data_type,
+            nucmer_breaklen=options.merge_breaklen,
+            ref_end_tolerance=options.merge_ref_end,
+            qry_end_tolerance=options.merge_reassemble_end,
+            threads=options.threads,
+            verbose=options.verbose,
+            reads=merge_reads
+        )
+        m.run()
 
 
     #-------------------------------- clean ----------------------------------
-    merge_log = merge_prefix + '.circularise.log'
-    contigs_to_keep = []
-    contigs_to_not_fix_start = []
-    with open(merge_log) as f:
-        for line in f:
-            if not line.startswith('[merge circularised]\t'):
-                continue
-            if line.rstrip() == '\t'.join(['[merge circularised]', '#Contig', 'repetitive_deleted', 'circl_using_nucmer', 'circl_using_spades', 'circularised']):
-                continue
-
-            x, name, u, y, z, circularised = line.rstrip().split('\t')
-            if circularised == '1':
-                contigs_to_keep.append(name)
-            else:
-                contigs_to_not_fix_start.append(name)
-
-    clean_keep_file = clean_prefix + '.contigs_to_keep'
-    with open(clean_keep_file, 'w') as f:
-        if len(contigs_to_keep) > 0:
-            print('\n'.join(contigs_to_keep), file=f)
-
-    not_fix_start_file = fixstart_prefix + '.contigs_to_not_change'
-    with open(not_fix_start_file, 'w') as f:
-        if len(contigs_to_not_fix_start) > 0:
-            print('\n'.join(contigs_to_not_fix_start), file=f)
-
-    print_message('{:_^79}'.format(' Running clean '), options)
-
-    cleaner = circlator.clean.Cleaner(
-        merged_fasta,
-        clean_prefix,
-        min_contig_length=options.clean_min_contig_length,
-        min_contig_percent_match=options.clean_min_contig_percent,
-        nucmer_diagdiff=options.clean_diagdiff,
-        nucmer_min_id=options.clean_min_nucmer_id,
-        nucmer_min_length=options.clean_min_nucmer_length,
-        nucmer_breaklen=options.clean_breaklen,
-        keepfile=clean_keep_file,
-        verbose=options.verbose
-    )
-    cleaner.run()
+    if 'clean' in stages_to_run:
+        number_circularized = 0
+        # write to temporary files and rename them when complete, so that a
+        # crash part way through cannot leave truncated files behind
+        with io.open(merge_log, 'r', buffering=IO_BUFFER_SIZE) as f, \
+          open(clean_keep_file + '.tmp', 'w', buffering=IO_BUFFER_SIZE) as f_keep, \
+          open(not_fix_start_file + '.tmp', 'w', buffering=IO_BUFFER_SIZE) as f_not_fix:
+            for line in f:
+                if not line.startswith(MERGE_LOG_PREFIX) or line.rstrip('\n') == MERGE_LOG_HEADER:
+                    continue
+
+                fields = line.rstrip('\n').rsplit('\t', 5)
+                name = fields[1]
+                if fields[-1] == '1':
+                    f_keep.write(name)
+                    f_keep.write('\n')
+                    number_circularized += 1
+                else:
+                    f_not_fix.write(name)
+                    f_not_fix.write('\n')
+
+            for fh in f_keep, f_not_fix:
+                fh.flush()
+                os.fsync(fh.fileno())
+
+        os.replace(clean_keep_file + '.tmp', clean_keep_file)
+        os.replace(not_fix_start_file + '.tmp', not_fix_start_file)
+
+        print_banner('Running clean', options)
+
+        cleaner = circlator.clean.Cleaner(
+            merged_fasta,
+            clean_prefix,
+            min_contig_length=options.clean_min_contig_length,
+            min_contig_percent_match=options.clean_min_contig_percent,
+            nucmer_diagdiff=options.clean_diagdiff,
+            nucmer_min_id=options.clean_min_nucmer_id,
+            nucmer_min_length=options.clean_min_nucmer_length,
+            nucmer_breaklen=options.clean_breaklen,
+            keepfile=clean_keep_file,
+            verbose=options.verbose
+        )
+        cleaner.run()
 
 
     #-------------------------------- fixstart -------------------------------
-    print_message('{:_^79}'.format(' Running fixstart '), options)
+    if 'fixstart' not in stages_to_run:
+        return
+
+    print_banner('Running fixstart', options)
     fixer = circlator.start_fixer.StartFixer(
         clean_fasta,
         fixstart_prefix,
@@ -279,10 +455,20 @@ def run():
     fixer.run()
 
     #-------------------------------- summary -------------------------------
-    print_message('{:_^79}'.format(' Summary '), options)
-    number_of_input_contigs = pyfastaq.tasks.count_sequences(original_assembly_renamed)
-    final_number_of_contigs = pyfastaq.tasks.count_sequences(fixstart_fasta)
-    number_circularized = len(contigs_to_keep)
+    print_banner('Summary', options)
+    # the merger loaded the input assembly and the fixer wrote the final one,
+    # so reuse their counts instead of reading the files again
+    if number_of_input_contigs is None:
+        if m is not None and assembly_to_use == original_assembly_renamed:
+            number_of_input_contigs = m.n_input_contigs
+        else:
+            number_of_input_contigs = pyfastaq.tasks.count_sequences(original_assembly_renamed)
+
+    if 'clean' not in stages_to_run:
+        with open(clean_keep_file) as f:
+            number_circularized = len([line for line in f if line.strip()])
+
+    final_number_of_contigs = fixer.n_output_contigs
     print_message('Number of input contigs: ' + str(number_of_input_contigs), options)
     print_message('Number of contigs after merging: ' + str(final_number_of_contigs), options)
     print_message(' '.join(['Circularized', str(number_circularized), 'of', str(final_number_of_contigs), 'contig(s)']), options)
@@ -12,6 +12,7 @@ def run():
     parser.add_argument('--threads', type=int, help='Number of threads [%(default)s]', default=1, metavar='INT')
     parser.add_argument('--verbose', action='store_true', help='Be verbose')
     parser.add_argument('--spades_k', help='Comma separated list of kmers to use when running SPAdes. Max kmer is 127 and each kmer should be an odd integer [%(default)s]', default='127,117,107,97,87,77', metavar='k1,k2,k3,...')
+    parser.add_argument('--spades_jobs', type=int, help='Max number of SPAdes kmers to run at once, sharing the threads. Each run needs its own RAM [%(default)s]', default=1, metavar='INT')
     parser.add_argument('--spades_use_first', action='store_true', help='Use the first successful SPAdes assembly. Default is to try all kmers and use the assembly with the largest N50')
     parser.add_argument('--assembler', choices=circlator.common.allowed_assemblers, help='Assembler to use for reassemblies [%(default)s]', default='spades')
     parser.add_argument('--data_type', choices=circlator.common.allowed_data_types, help='String representing one of the 4 type of data analysed (only used for Canu) [%(default)s]', default='pacbio-corrected')
@@ -27,6 +28,7 @@ def run():
         only_assembler=not options.not_only_assembler,
         spades_kmers=options.spades_k,
         spades_use_first_success=options.spades_use_first,
+        spades_max_jobs=options.spades_jobs,
         assembler=options.assembler,
         data_type=options.data_type,
         verbose=options.verbose
@@ -0,0 +1,60 @@
+import unittest
+import filecmp
+import os
+import shutil
+import pyfastaq
+from circlator.tasks import all as task_all
+
+modules_dir = os.path.dirname(os.path.dirname(os.path.abspath(task_all.__file__)))
+data_dir = os.path.join(modules_dir, 'tests', 'data')
+
+
+class TestAll(unittest.TestCase):
+    def test_filter_fasta(self):
+        '''test filter_fasta'''
+        infile = os.path.join(data_dir, 'all_test_filter_fasta.in.fa')
+        ids_file = os.path.join(data_dir, 'all_test_filter_fasta.ids')
+        expected = os.path.join(data_dir, 'all_test_filter_fasta.expect.fa')
+        tmp_in = 'tmp.all_test_filter_fasta.in.fa'
+        tmp_out = 'tmp.all_test_filter_fasta.out.fa'
+        tmp_pyfastaq_out = 'tmp.all_test_filter_fasta.pyfastaq.fa'
+        shutil.copyfile(infile, tmp_in)
+        task_all.filter_fasta(tmp_in, tmp_out, ids_file)
+        pyfastaq.tasks.filter(tmp_in, tmp_pyfastaq_out, ids_file=ids_file)
+        self.assertTrue(filecmp.cmp(expected, tmp_out, shallow=False))
+        self.assertTrue(filecmp.cmp(tmp_pyfastaq_out, tmp_out, shallow=False))
+        for filename in [tmp_in, tmp_in + '.fai', tmp_out, tmp_pyfastaq_out]:
+            if os.path.exists(filename):
+                os.unlink(filename)
+
+
+    def test_remove_stage_files(self):
+        '''test remove_stage_files'''
+        tmp_dir = 'tmp.all_test_remove_stage_files'
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir)
+        os.mkdir(tmp_dir)
+        os.mkdir(os.path.join(tmp_dir, '03.assemble'))
+        filenames = [
+            '00.info.txt',
+            '01.mapreads.bam',
+            '02.bam2reads.fasta',
+            os.path.join('03.assemble', 'contigs.fasta'),
+            '04.merge.fasta',
+            '05.clean.fasta',
+            '06.fixstart.contigs_to_not_change',
+            '06.fixstart.fasta',
+        ]
+        for filename in filenames:
+            with open(os.path.join(tmp_dir, filename), 'w') as f:
+                pass
+
+        keep = os.path.join(tmp_dir, '06.fixstart.contigs_to_not_change')
+        task_all.remove_stage_files(tmp_dir, ['assemble', 'merge', 'fixstart'], keep={keep})
+        expected = ['00.info.txt', '01.mapreads.bam', '02.bam2reads.fasta', '05.clean.fasta', '06.fixstart.contigs_to_not_change']
+        self.assertEqual(expected, sorted(os.listdir(tmp_dir)))
+
+        task_all.remove_stage_files(tmp_dir, ['mapreads', 'fixstart'])
+        expected = ['00.info.txt', '02.bam2reads.fasta', '05.clean.fasta']
+        self.assertEqual(expected, sorted(os.listdir(tmp_dir)))
+        shutil.rmtree(tmp_dir)
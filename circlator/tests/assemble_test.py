@@ -2,6 +2,8 @@ import unittest
 import filecmp
 import os
 import shutil
+import threading
+from unittest import mock
 import pyfastaq
 from circlator import assemble
 
@@ -60,6 +62,52 @@ class TestAssemble(unittest.TestCase):
 
         self.assembler.threads = 2
         self.assertEqual(cmd_start + ' -o out -t 2 -k 41 --careful --only-assembler', self.assembler._make_spades_command(41, 'out'))
+        self.assertEqual(cmd_start + ' -o out -t 3 -k 41 --careful --only-assembler', self.assembler._make_spades_command(41, 'out', threads=3))
+
+
+    def _fake_run_spades_once(self, failing_kmers, kmers_run):
+        '''Returns a replacement for run_spades_once, which writes one contig
+           of length kmer, or fails if kmer is in failing_kmers'''
+        lock = threading.Lock()
+        def run_spades_once(kmer, outdir, threads=None):
+            with lock:
+                kmers_run.append(kmer)
+            if kmer in failing_kmers:
+                return False, 'error'
+            with open(os.path.join(outdir, 'contigs.fasta'), 'w') as f:
+                print('>contig', 'A' * kmer, sep='\n', file=f)
+            return True, None
+        return run_spades_once
+
+
+    def test_run_spades_first_success(self):
+        '''test run_spades stopping at first success'''
+        self.assembler.spades_kmers = [127, 117, 107]
+        self.assembler.threads = 3
+        self.assembler.spades_max_jobs = 3
+        kmers_run = []
+        with mock.patch.object(self.assembler, 'run_spades_once', self._fake_run_spades_once({127}, kmers_run)):
+            self.assembler.run_spades(stop_at_first_success=True)
+        self.assertEqual([127, 117], kmers_run)
+        got = {}
+        pyfastaq.tasks.file_to_dict(os.path.join(self.tmp_assemble_dir, 'contigs.fasta'), got)
+        self.assertEqual(117, len(got['contig']))
+        shutil.rmtree(self.tmp_assemble_dir)
+
+
+    def test_run_spades_all_kmers(self):
+        '''test run_spades trying all kmers'''
+        self.assembler.spades_kmers = [117, 127, 107]
+        self.assembler.threads = 2
+        self.assembler.spades_max_jobs = 2
+        kmers_run = []
+        with mock.patch.object(self.assembler, 'run_spades_once', self._fake_run_spades_once({107}, kmers_run)):
+            self.assembler.run_spades()
+        self.assertEqual([107, 117, 127], sorted(kmers_run))
+        got = {}
+        pyfastaq.tasks.file_to_dict(os.path.join(self.tmp_assemble_dir, 'contigs.fasta'), got)
+        self.assertEqual(127, len(got['contig']))
+        shutil.rmtree(self.tmp_assemble_dir)
 
 
     def test_make_canu_command(self):
@@ -13,3 +13,27 @@ class TestCommon(unittest.TestCase):
         common.check_files_exist([file_exists])
         with self.assertRaises(common.Error):
             common.check_files_exist([file_exists, 'thisisnotafileandshouldcauseanerror'])
+
+
+    def test_count_clean_fasta(self):
+        '''test count_clean_fasta'''
+        prefix = os.path.join(data_dir, 'common_test_count_clean_fasta.')
+        self.assertEqual(3, common.count_clean_fasta(prefix + 'ok.fa'))
+        self.assertEqual(None, common.count_clean_fasta(prefix + 'whitespace.fa'))
+        self.assertEqual(None, common.count_clean_fasta(prefix + 'not_unique.fa'))
+        self.assertEqual(None, common.count_clean_fasta(prefix + 'fastq.fq'))
+        self.assertEqual(None, common.count_clean_fasta(prefix + 'uneven_lines.fa'))
+        self.assertEqual(None, common.count_clean_fasta(prefix + 'blank_line.fa'))
+
+
+    def test_working_directory(self):
+        '''test working_directory'''
+        original_dir = os.getcwd()
+        with common.working_directory(data_dir):
+            self.assertEqual(os.path.realpath(data_dir), os.path.realpath(os.getcwd()))
+        self.assertEqual(original_dir, os.getcwd())
+
+        with self.assertRaises(common.Error):
+            with common.working_directory(data_dir):
+                raise common.Error('test')
+        self.assertEqual(original_dir, os.getcwd())
@@ -217,6 +217,7 @@ class TestStartFixer(unittest.TestCase):
         sfixer.run()
         expected_fa = os.path.join(data_dir, 'start_fixer_run_bit_of_everything.expect.fa')
         self.assertTrue(filecmp.cmp(expected_fa, tmp_prefix + '.fasta'))
+        self.assertEqual(4, sfixer.n_output_contigs)
 
         for suffix in ['detailed.log', 'fasta', 'log', 'promer.contigs_with_ends.fa', 'promer.promer', 'prodigal.for_prodigal.fa', 'prodigal.prodigal.gff']:
             try:
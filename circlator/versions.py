@@ -1,3 +1,4 @@
+import io
 import sys
 import openpyxl
 import pyfastaq
@@ -8,6 +9,25 @@ from circlator import __version__ as circlator_version
 
 
 def get_all_versions(filehandle, raise_error=True, debug=False, assembler=None):
+    '''Checks circlator's dependencies and returns a report of their versions,
+       which is also written to filehandle (if not None). The report is built in
+       memory and written in one go, unless debug is True, so that it stays in
+       order with the debug messages. In that case None is returned'''
+    if debug:
+        _write_all_versions(filehandle, raise_error=raise_error, debug=debug, assembler=assembler)
+        return None
+
+    report = io.StringIO()
+    try:
+        _write_all_versions(report, raise_error=raise_error, debug=debug, assembler=assembler)
+    finally:
+        if filehandle is not None:
+            filehandle.write(report.getvalue())
+
+    return report.getvalue()
+
+
+def _write_all_versions(filehandle, raise_error=True, debug=False, assembler=None):
     if filehandle is not None:
         print('Circlator version:', circlator_version, file=filehandle)
         print('\nExternal dependencies:', file=filehandle)